@@ -9,6 +9,7 @@ load_dotenv()
 
 from briefing_engine import (
     add_submission,
+    briefing_path,
     delete_submission,
     generate_full_briefing,
     get_week_date_range,
@@ -16,13 +17,18 @@ from briefing_engine import (
     list_cached_weeks,
     load_briefing,
     load_submissions,
+    submissions_path,
 )
 import re
 
-from config import SECTIONS
+from config import SECTIONS, SECTIONS_BY_ID
 from export import briefing_to_markdown, briefing_to_pdf
 
 
+_HEADING_RE = re.compile(r"^#{1,3}\s+(.+)$", re.MULTILINE)
+_JAMMED_LINK_RE = re.compile(r"([^\s(\[])\[([^\]]+)\]\(")
+
+
 def _normalize_content(text: str) -> str:
     """Normalize markdown content for consistent display.
 
@@ -30,13 +36,71 @@ def _normalize_content(text: str) -> str:
     - Escape $ to prevent LaTeX rendering
     """
     # Convert ### / ## / # headings within content to bold sub-headers
-    text = re.sub(r"^#{1,3}\s+(.+)$", r"**\1**", text, flags=re.MULTILINE)
+    text = _HEADING_RE.sub(r"**\1**", text)
     # Insert space before markdown links that are jammed against preceding text
-    text = re.sub(r"([^\s(\[])\[([^\]]+)\]\(", r"\1 [\2](", text)
+    text = _JAMMED_LINK_RE.sub(r"\1 [\2](", text)
     # Escape dollar signs
     text = text.replace("$", "\\$")
     return text
 
+
+# --- Cached loaders ---
+# Reruns happen on every widget interaction, so keep parsed JSON in memory.
+# The file's mtime is part of the cache key, so any write invalidates it.
+
+
+def _mtime(path: str) -> float:
+    """Return a file's modification time, or 0.0 if it doesn't exist yet."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _cached_load_briefing(week_key: str, mtime: float) -> dict | None:
+    return load_briefing(week_key)
+
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _cached_load_submissions(week_key: str, mtime: float) -> list[dict]:
+    return load_submissions(week_key)
+
+
+def _load_briefing(week_key: str) -> dict | None:
+    return _cached_load_briefing(week_key, _mtime(briefing_path(week_key)))
+
+
+def _load_submissions(week_key: str) -> list[dict]:
+    return _cached_load_submissions(week_key, _mtime(submissions_path(week_key)))
+
+
+# --- Cached rendering ---
+# Keyed by week and generation time, so regenerating a briefing invalidates
+# them. The briefing itself is passed unhashed (leading underscore).
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _display_content(week_key: str, generated_at: str, _briefing: dict) -> dict:
+    """Return the briefing's top 3 and section content normalized for display."""
+    return {
+        "top3": _normalize_content(_briefing.get("top3", "")),
+        "sections": {
+            section_id: _normalize_content(content)
+            for section_id, content in _briefing["sections"].items()
+        },
+    }
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _markdown_export(week_key: str, generated_at: str, _briefing: dict) -> str:
+    return briefing_to_markdown(_briefing)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _pdf_export(week_key: str, generated_at: str, _briefing: dict) -> bytes:
+    return briefing_to_pdf(_briefing)
+
 # --- Page config ---
 
 st.set_page_config(
@@ -127,38 +191,69 @@ with tab_briefing:
     # Handle generation
     if generate_clicked and api_key:
         if cache_exists and not regenerate:
-            briefing = load_briefing(selected_week)
+            briefing = _load_briefing(selected_week)
             st.info("Loaded a previously saved briefing. Check 'Regenerate' in the sidebar to create a fresh one.")
         else:
-            progress_bar = st.progress(0, text="Starting briefing generation...")
+            progress_bar = st.progress(0, text="Researching sections...")
 
             def update_progress(current, total, section_name):
+                # Sections are fetched together and report as each one lands;
+                # the last step (total - 1 onwards) is writing the Top 3
                 pct = current / total
-                if current < total:
-                    progress_bar.progress(pct, text=f"Researching: {section_name}...")
+                if current < total - 1:
+                    progress_bar.progress(
+                        pct, text=f"Received {section_name} ({current}/{total - 1})"
+                    )
+                elif current < total:
+                    progress_bar.progress(pct, text="Writing Top 3 highlights...")
                 else:
                     progress_bar.progress(1.0, text="Briefing complete!")
 
+            # Show each section as soon as it arrives, in its final position
+            live_sections = st.empty()
+            with live_sections.container():
+                section_slots = {section["id"]: st.empty() for section in SECTIONS}
+            for section in SECTIONS:
+                section_slots[section["id"]].caption(
+                    f"{section['emoji']} {section['title']} — researching..."
+                )
+
+            def show_section(section_id, content):
+                slot = section_slots[section_id]
+                if content is None:
+                    slot.empty()
+                    return
+                section = SECTIONS_BY_ID[section_id]
+                with slot.container():
+                    with st.expander(f"{section['emoji']} {section['title']}", expanded=expand_all):
+                        st.markdown(_normalize_content(content))
+
             with st.spinner("Generating briefing..."):
                 briefing = generate_full_briefing(
                     api_key, selected_week,
                     progress_callback=update_progress,
                     investment_context=investment_context,
+                    section_callback=show_section,
                 )
+            # The full briefing is rendered below
+            live_sections.empty()
+            _cached_load_briefing.clear()
             st.success("Briefing generated and cached!")
     else:
         # Try to load from cache
-        briefing = load_briefing(selected_week)
+        briefing = _load_briefing(selected_week)
 
     # Display briefing
     if briefing:
         start_date, end_date = get_week_date_range(selected_week)
         st.markdown(f"## {start_date} — {end_date}")
+        generated_at = briefing.get("generated_at", "")
+        rendered = _display_content(selected_week, generated_at, briefing)
 
         # Export buttons
         col1, col2, col3 = st.columns([6, 1, 1])
         with col2:
-            md_content = briefing_to_markdown(briefing)
+            md_content = _markdown_export(selected_week, generated_at, briefing)
             st.download_button(
                 "\U0001F4DD MD",
                 data=md_content,
@@ -166,7 +261,7 @@ with tab_briefing:
                 mime="text/markdown",
             )
         with col3:
-            pdf_bytes = briefing_to_pdf(briefing)
+            pdf_bytes = _pdf_export(selected_week, generated_at, briefing)
             st.download_button(
                 "\U0001F4C4 PDF",
                 data=pdf_bytes,
@@ -177,22 +272,21 @@ with tab_briefing:
         # Top 3 highlights
         if briefing.get("top3"):
             st.markdown("#### Key Developments This Week")
-            st.markdown(_normalize_content(briefing["top3"]))
+            st.markdown(rendered["top3"])
 
         st.markdown("---")
 
         # Sections
-        for section in SECTIONS:
-            data = briefing["sections"].get(section["id"])
-            if not data:
+        for section_id, content in rendered["sections"].items():
+            section = SECTIONS_BY_ID.get(section_id)
+            if not section or not content:
                 continue
-            with st.expander(f"{data['emoji']} {data['title']}", expanded=expand_all):
-                st.markdown(_normalize_content(data["content"]))
+            with st.expander(f"{section['emoji']} {section['title']}", expanded=expand_all):
+                st.markdown(content)
 
         # Footer
         st.markdown("---")
-        generated_at = briefing.get("generated_at", "")[:16].replace("T", " ")
-        st.caption(f"Generated: {generated_at}")
+        st.caption(f"Generated: {generated_at[:16].replace('T', ' ')}")
     else:
         st.markdown("## Welcome")
         st.markdown(
@@ -206,6 +300,48 @@ with tab_briefing:
 
 # --- Tab 2: Submit Stories ---
 
+
+def _delete_submission(week_key: str, index: int):
+    delete_submission(week_key, index)
+    _cached_load_submissions.clear()
+
+
+@st.fragment
+def _render_submissions(week_key: str):
+    """Render the week's submissions, newest first.
+
+    Runs as a fragment so deleting a story only reruns this list, not the page.
+    Deletes happen in the button callback, before the list is redrawn."""
+    submissions = _load_submissions(week_key)
+    if not submissions:
+        st.caption("No stories submitted for this week yet.")
+        return
+
+    for real_index, sub in reversed(list(enumerate(submissions))):
+        col_content, col_delete = st.columns([9, 1])
+        with col_content:
+            link = f"[{sub['url']}]({sub['url']})"
+            parts = [f"**{link}**"]
+            if sub.get("note"):
+                parts.append(f"  \n{sub['note']}")
+            meta = []
+            if sub.get("submitted_by"):
+                meta.append(sub["submitted_by"])
+            if sub.get("timestamp"):
+                meta.append(sub["timestamp"][:16].replace("T", " "))
+            if meta:
+                parts.append(f"  \n*{' · '.join(meta)}*")
+            st.markdown("\n".join(parts))
+        with col_delete:
+            st.button(
+                "\U0001F5D1",
+                key=f"del_{real_index}",
+                on_click=_delete_submission,
+                args=(week_key, real_index),
+            )
+        st.markdown("---")
+
+
 with tab_submit:
     st.subheader(f"\U0001F4E5 Submit Stories for {selected_week}")
     st.markdown(
@@ -221,6 +357,7 @@ with tab_submit:
         if submitted:
             if url and url.startswith("http"):
                 add_submission(selected_week, url, note, submitted_by)
+                _cached_load_submissions.clear()
                 st.success("Story submitted!")
                 st.rerun()
             else:
@@ -229,29 +366,4 @@ with tab_submit:
     st.markdown("---")
     st.markdown("#### Submitted stories")
 
-    submissions = load_submissions(selected_week)
-    if not submissions:
-        st.caption("No stories submitted for this week yet.")
-    else:
-        # Show newest first
-        for i, sub in enumerate(reversed(submissions)):
-            real_index = len(submissions) - 1 - i
-            col_content, col_delete = st.columns([9, 1])
-            with col_content:
-                link = f"[{sub['url']}]({sub['url']})"
-                parts = [f"**{link}**"]
-                if sub.get("note"):
-                    parts.append(f"  \n{sub['note']}")
-                meta = []
-                if sub.get("submitted_by"):
-                    meta.append(sub["submitted_by"])
-                if sub.get("timestamp"):
-                    meta.append(sub["timestamp"][:16].replace("T", " "))
-                if meta:
-                    parts.append(f"  \n*{' · '.join(meta)}*")
-                st.markdown("\n".join(parts))
-            with col_delete:
-                if st.button("\U0001F5D1", key=f"del_{real_index}"):
-                    delete_submission(selected_week, real_index)
-                    st.rerun()
-            st.markdown("---")
+    _render_submissions(selected_week)
@@ -1,25 +1,47 @@
 """Core logic: Perplexity API calls, caching, briefing generation, and submissions."""
 
+import asyncio
+import hashlib
 import json
 import os
 import re
+import stat
+import threading
+import time
+import uuid
+from collections import deque
 from datetime import datetime, timedelta
+from functools import lru_cache
 
-from openai import OpenAI
+import streamlit as st
+from openai import AsyncOpenAI
 
 from config import (
     DATA_DIR,
     PERPLEXITY_BASE_URL,
+    PERPLEXITY_MAX_CONCURRENT,
+    PERPLEXITY_MAX_RETRIES,
     PERPLEXITY_MODEL,
+    PERPLEXITY_REQUESTS_PER_MINUTE,
     SECTIONS,
+    SECTIONS_BY_ID,
     SUBMISSIONS_DIR,
     SYSTEM_PROMPT,
 )
 
 
-def get_client(api_key: str) -> OpenAI:
-    """Return an OpenAI client pointed at the Perplexity API."""
-    return OpenAI(api_key=api_key, base_url=PERPLEXITY_BASE_URL)
+def get_client(api_key: str) -> AsyncOpenAI:
+    """Return an async OpenAI client pointed at the Perplexity API.
+
+    Not cached across generations: the client's connection pool is bound to
+    the event loop it runs on, so each generation opens (and closes) its own.
+    Rate-limit and server errors are retried with exponential backoff by the
+    client itself."""
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=PERPLEXITY_BASE_URL,
+        max_retries=PERPLEXITY_MAX_RETRIES,
+    )
 
 
 def get_week_key(date=None, previous=False) -> str:
@@ -29,9 +51,11 @@ def get_week_key(date=None, previous=False) -> str:
         date = datetime.now()
     if previous:
         date = date - timedelta(days=7)
-    return f"{date.isocalendar()[0]}-W{date.isocalendar()[1]:02d}"
+    year, week_num, _ = date.isocalendar()
+    return f"{year}-W{week_num:02d}"
 
 
+@lru_cache(maxsize=256)
 def get_week_date_range(week_key: str) -> tuple[str, str]:
     """Return human-readable (start, end) date strings for an ISO week key."""
     year, week_num = int(week_key[:4]), int(week_key.split("W")[1])
@@ -47,57 +71,131 @@ def get_week_date_range(week_key: str) -> tuple[str, str]:
 # --- Submissions ---
 
 
+_dirs_ready = False
+
+
 def _ensure_dirs():
+    global _dirs_ready
+    if _dirs_ready:
+        return
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(SUBMISSIONS_DIR, exist_ok=True)
+    _dirs_ready = True
+
+
+def submissions_path(week_key: str) -> str:
+    """Return the JSON Lines file holding submissions for a given week."""
+    return os.path.join(SUBMISSIONS_DIR, f"{week_key}.jsonl")
+
+
+def _legacy_submissions_path(week_key: str) -> str:
+    """Return the pre-JSON Lines submissions file (a single JSON array)."""
+    return os.path.join(SUBMISSIONS_DIR, f"{week_key}.json")
+
+
+def briefing_path(week_key: str) -> str:
+    """Return the file path of the cached briefing for a given week."""
+    return os.path.join(DATA_DIR, f"{week_key}.json")
+
+
+def _dumps(data) -> str:
+    """Serialize data as compact JSON; these files are only ever read by the app."""
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _atomic_write(path: str, text: str):
+    """Write text via a temp file and rename, so readers never see a torn file."""
+    # A file that already exists keeps its mode; a new one gets the umask
+    # default, applied by the kernel when the temp file is created below
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = None
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with open(fd, "w") as f:
+            f.write(text)
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write_json(path: str, data):
+    _atomic_write(path, _dumps(data))
+
+
+def _write_jsonl(path: str, records: list[dict]):
+    _atomic_write(path, "".join(_dumps(r) + "\n" for r in records))
+
+
+# Streamlit sessions are threads in one process, so this serializes writers
+_submissions_lock = threading.Lock()
+
+
+def _migrate_legacy_submissions(week_key: str):
+    """Convert a week's old JSON array file to JSON Lines, if there is one."""
+    legacy = _legacy_submissions_path(week_key)
+    if not os.path.exists(legacy):
+        return
+    with open(legacy) as f:
+        _write_jsonl(submissions_path(week_key), json.load(f))
+    os.remove(legacy)
 
 
 def add_submission(week_key: str, url: str, note: str = "", submitted_by: str = ""):
     """Append a URL submission for a given week."""
     _ensure_dirs()
-    path = os.path.join(SUBMISSIONS_DIR, f"{week_key}.json")
-    submissions = load_submissions(week_key)
-    submissions.append(
-        {
-            "url": url,
-            "note": note,
-            "submitted_by": submitted_by,
-            "timestamp": datetime.now().isoformat(),
-        }
-    )
-    with open(path, "w") as f:
-        json.dump(submissions, f, indent=2)
+    record = {
+        "url": url,
+        "note": note,
+        "submitted_by": submitted_by,
+        "timestamp": datetime.now().isoformat(),
+    }
+    with _submissions_lock:
+        _migrate_legacy_submissions(week_key)
+        # Appending one line keeps adds O(1) however many stories the week has
+        with open(submissions_path(week_key), "a") as f:
+            f.write(_dumps(record) + "\n")
+    _list_weeks.clear()
 
 
 def delete_submission(week_key: str, index: int):
     """Delete a submission by index for a given week."""
     _ensure_dirs()
-    path = os.path.join(SUBMISSIONS_DIR, f"{week_key}.json")
-    submissions = load_submissions(week_key)
-    if 0 <= index < len(submissions):
-        submissions.pop(index)
-        with open(path, "w") as f:
-            json.dump(submissions, f, indent=2)
+    with _submissions_lock:
+        _migrate_legacy_submissions(week_key)
+        submissions = load_submissions(week_key)
+        if 0 <= index < len(submissions):
+            submissions.pop(index)
+            _write_jsonl(submissions_path(week_key), submissions)
 
 
 def load_submissions(week_key: str) -> list[dict]:
     """Load all submissions for a given week."""
     _ensure_dirs()
-    path = os.path.join(SUBMISSIONS_DIR, f"{week_key}.json")
+    path = submissions_path(week_key)
     if not os.path.exists(path):
-        return []
+        legacy = _legacy_submissions_path(week_key)
+        if not os.path.exists(legacy):
+            return []
+        try:
+            with open(legacy) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # Migrated to JSON Lines by another session since the check above
+            pass
     with open(path) as f:
-        return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
 
 
 def list_submission_weeks() -> list[str]:
     """List all weeks that have submissions."""
     _ensure_dirs()
-    weeks = []
-    for fname in os.listdir(SUBMISSIONS_DIR):
-        if fname.endswith(".json"):
-            weeks.append(fname.replace(".json", ""))
-    return sorted(weeks, reverse=True)
+    return _list_weeks(SUBMISSIONS_DIR, os.path.getmtime(SUBMISSIONS_DIR))
 
 
 # --- Briefing Cache ---
@@ -106,36 +204,114 @@ def list_submission_weeks() -> list[str]:
 def save_briefing(week_key: str, briefing: dict):
     """Save a briefing dict to the cache."""
     _ensure_dirs()
-    path = os.path.join(DATA_DIR, f"{week_key}.json")
-    with open(path, "w") as f:
-        json.dump(briefing, f, indent=2)
+    path = briefing_path(week_key)
+    _write_json(path, briefing)
+    _list_weeks.clear()
 
 
 def load_briefing(week_key: str) -> dict | None:
     """Load a cached briefing, or None if not found."""
     _ensure_dirs()
-    path = os.path.join(DATA_DIR, f"{week_key}.json")
+    path = briefing_path(week_key)
     if not os.path.exists(path):
         return None
     with open(path) as f:
-        return json.load(f)
+        briefing = json.load(f)
+    # Older briefings stored each section as {"title", "emoji", "content"}
+    for section_id, data in briefing["sections"].items():
+        if isinstance(data, dict):
+            briefing["sections"][section_id] = data["content"]
+    return briefing
 
 
 def list_cached_weeks() -> list[str]:
     """List all weeks with cached briefings."""
     _ensure_dirs()
-    weeks = []
-    for fname in os.listdir(DATA_DIR):
-        if fname.endswith(".json"):
-            weeks.append(fname.replace(".json", ""))
+    return _list_weeks(DATA_DIR, os.path.getmtime(DATA_DIR))
+
+
+@st.cache_data(ttl=60, max_entries=16, show_spinner=False)
+def _list_weeks(directory: str, dir_mtime: float) -> list[str]:
+    """List week keys for the JSON / JSON Lines files in a directory, newest first.
+
+    dir_mtime only keys the cache: adding or removing a file bumps it."""
+    weeks = set()
+    for fname in os.listdir(directory):
+        week_key, ext = os.path.splitext(fname)
+        if ext in (".json", ".jsonl"):
+            weeks.add(week_key)
     return sorted(weeks, reverse=True)
 
 
 # --- Perplexity API ---
 
-
-def fetch_section(
-    client: OpenAI,
+_CITATION_RE = re.compile(r"\[(\d+)\]")
+
+# Perplexity rate limits apply per API key, across every session in the
+# process, so requests are limited per key rather than per generation.
+# Keyed by a hash of the API key, so keys typed into the sidebar aren't kept.
+_api_limits: dict[str, "_KeyLimits"] = {}
+_api_limits_lock = threading.Lock()
+# How often a request waiting for a free slot checks again
+_API_SLOT_POLL_SECONDS = 0.05
+
+
+class _KeyLimits:
+    """In-flight and per-minute request limits for one API key."""
+
+    def __init__(self):
+        self.slots = threading.BoundedSemaphore(PERPLEXITY_MAX_CONCURRENT)
+        self._lock = threading.Lock()
+        # Send times of the requests made in the last minute, oldest first
+        self._sent = deque()
+
+    def reserve_request(self) -> float:
+        """Record a request about to be sent and return 0, or return how many
+        seconds to wait before trying again if the per-minute limit is reached."""
+        with self._lock:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= 60:
+                self._sent.popleft()
+            if len(self._sent) < PERPLEXITY_REQUESTS_PER_MINUTE:
+                self._sent.append(now)
+                return 0
+            return 60 - (now - self._sent[0])
+
+
+def _key_limits(api_key: str) -> _KeyLimits:
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+    with _api_limits_lock:
+        if key_hash not in _api_limits:
+            _api_limits[key_hash] = _KeyLimits()
+        return _api_limits[key_hash]
+
+
+async def _create_completion(client: AsyncOpenAI, **kwargs):
+    """Create a chat completion once the API key has a request slot free and
+    is under its per-minute limit.
+
+    Waiters poll for a slot rather than queueing, so there is no FIFO order:
+    under contention, one session's requests can keep losing the race to
+    another's until its own generation finishes."""
+    limits = _key_limits(client.api_key)
+    # Poll rather than block a worker thread on acquire: a cancelled wait then
+    # never leaves a slot taken with nobody to release it
+    while not limits.slots.acquire(blocking=False):
+        await asyncio.sleep(_API_SLOT_POLL_SECONDS)
+    try:
+        # Counted just before sending (not before waiting for a slot), so no
+        # 60-second window ever holds more than the limit
+        wait = limits.reserve_request()
+        while wait:
+            await asyncio.sleep(wait)
+            wait = limits.reserve_request()
+        return await client.chat.completions.create(**kwargs)
+    finally:
+        limits.slots.release()
+
+
+async def fetch_section(
+    client: AsyncOpenAI,
     section: dict,
     week_key: str,
     submitted_urls: list[dict],
@@ -158,7 +334,8 @@ def fetch_section(
             f"\n\nAlso consider these stories submitted by our team:\n{urls_text}"
         )
 
-    response = client.chat.completions.create(
+    response = await _create_completion(
+        client,
         model=PERPLEXITY_MODEL,
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
@@ -174,14 +351,16 @@ def fetch_section(
     return response.choices[0].message.content
 
 
-def fetch_top3(client: OpenAI, briefing: dict, investment_context: str = "") -> str:
+async def fetch_top3(client: AsyncOpenAI, briefing: dict, investment_context: str = "") -> str:
     """Review all section content and identify the 3 most significant developments."""
-    all_content = "\n\n".join(
-        f"## {data['title']}\n{data['content']}"
-        for data in briefing["sections"].values()
-    )
-
-    response = client.chat.completions.create(
+    # str.join materialises its input anyway, so build the list directly
+    all_content = "\n\n".join([
+        f"## {SECTIONS_BY_ID[section_id]['title']}\n{content}"
+        for section_id, content in briefing["sections"].items()
+    ])
+
+    response = await _create_completion(
+        client,
         model="sonar",
         messages=[
             {
@@ -233,22 +412,78 @@ def fetch_top3(client: OpenAI, briefing: dict, investment_context: str = "") ->
             },
         ],
         temperature=0.1,
+        # Top 3 only synthesises the content supplied above, so skip the web
+        # search step and its added latency
+        extra_body={"disable_search": True},
     )
 
     result = response.choices[0].message.content
     # Strip any remaining [N] numbered citations that Perplexity adds
-    result = re.sub(r"\[(\d+)\]", "", result)
+    result = _CITATION_RE.sub("", result)
     return result
 
 
+async def _fetch_sections(
+    client: AsyncOpenAI,
+    week_key: str,
+    submissions: list[dict],
+    progress_callback=None,
+    section_callback=None,
+) -> dict[str, str]:
+    """Fetch all sections concurrently. Returns content keyed by section id,
+    leaving out optional sections with nothing to report."""
+    # Sections are independent and network-bound, so run them all on one event
+    # loop; _create_completion keeps the API key within its rate limits.
+    async def fetch(section):
+        try:
+            content = await fetch_section(client, section, week_key, submissions)
+        except Exception as e:
+            content = f"*Error fetching this section: {e}*"
+        return section, content
+
+    contents = {}
+    pending = [fetch(section) for section in SECTIONS]
+    for done, next_result in enumerate(asyncio.as_completed(pending), start=1):
+        section, content = await next_result
+
+        # Skip optional sections with no content
+        if section.get("optional") and "NO_CONTENT" in content:
+            content = None
+        else:
+            contents[section["id"]] = content
+
+        if section_callback:
+            section_callback(section["id"], content)
+        if progress_callback:
+            progress_callback(done, len(SECTIONS) + 1, section["title"])
+    return contents
+
+
 def generate_full_briefing(
     api_key: str,
     week_key: str,
     progress_callback=None,
     investment_context: str = "",
+    section_callback=None,
+) -> dict:
+    """Generate a full briefing across all sections. Returns a briefing dict.
+
+    section_callback(section_id, content) is called as each section arrives,
+    with content None for optional sections that had nothing to report."""
+    return asyncio.run(
+        _generate_full_briefing(
+            api_key, week_key, progress_callback, investment_context, section_callback
+        )
+    )
+
+
+async def _generate_full_briefing(
+    api_key: str,
+    week_key: str,
+    progress_callback,
+    investment_context: str,
+    section_callback,
 ) -> dict:
-    """Generate a full briefing across all sections. Returns a briefing dict."""
-    client = get_client(api_key)
     submissions = load_submissions(week_key)
     start_date, end_date = get_week_date_range(week_key)
 
@@ -259,33 +494,25 @@ def generate_full_briefing(
         "sections": {},
     }
 
-    for i, section in enumerate(SECTIONS):
+    async with get_client(api_key) as client:
+        contents = await _fetch_sections(
+            client, week_key, submissions, progress_callback, section_callback
+        )
+        # Keep SECTIONS order; title and emoji come from config, so store content only
+        briefing["sections"] = {
+            section["id"]: contents[section["id"]]
+            for section in SECTIONS
+            if section["id"] in contents
+        }
+
+        # Generate Top 3 from all section content
         if progress_callback:
-            progress_callback(i, len(SECTIONS), section["title"])
+            progress_callback(len(SECTIONS), len(SECTIONS) + 1, "Top 3 highlights")
 
         try:
-            content = fetch_section(client, section, week_key, submissions)
+            briefing["top3"] = await fetch_top3(client, briefing, investment_context)
         except Exception as e:
-            content = f"*Error fetching this section: {e}*"
-
-        # Skip optional sections with no content
-        if section.get("optional") and "NO_CONTENT" in content:
-            continue
-
-        briefing["sections"][section["id"]] = {
-            "title": section["title"],
-            "emoji": section["emoji"],
-            "content": content,
-        }
-
-    # Generate Top 3 from all section content
-    if progress_callback:
-        progress_callback(len(SECTIONS), len(SECTIONS) + 1, "Top 3 highlights")
-
-    try:
-        briefing["top3"] = fetch_top3(client, briefing, investment_context)
-    except Exception as e:
-        briefing["top3"] = f"*Error generating highlights: {e}*"
+            briefing["top3"] = f"*Error generating highlights: {e}*"
 
     if progress_callback:
         progress_callback(len(SECTIONS) + 1, len(SECTIONS) + 1, "Done")
@@ -4,6 +4,12 @@ import os
 
 PERPLEXITY_MODEL = "sonar-pro"
 PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+# Perplexity's rate limit for sonar / sonar-pro at the lowest usage tier; the
+# app keeps each API key under it across all sessions. Raise it to match the
+# key's usage tier.
+PERPLEXITY_REQUESTS_PER_MINUTE = 50
+# Retries on 429 / 5xx, with exponential backoff and jitter (handled by the SDK)
+PERPLEXITY_MAX_RETRIES = 4
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 SUBMISSIONS_DIR = os.path.join(os.path.dirname(__file__), "submissions")
@@ -175,6 +181,13 @@ SECTIONS = [
     },
 ]
 
+SECTIONS_BY_ID = {section["id"]: section for section in SECTIONS}
+
+# Cap on in-flight API requests per API key, shared by all sessions: every
+# section of one generation at once, plus another generation's Top 3 call.
+# The per-minute limit above is what keeps a key clear of 429s.
+PERPLEXITY_MAX_CONCURRENT = len(SECTIONS) + 1
+
 SYSTEM_PROMPT = (
     "You are a senior food industry analyst based in London, preparing a weekly "
     "briefing for UK-based investors and executives.\n\n"
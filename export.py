@@ -1,36 +1,36 @@
 """Markdown and PDF export for briefings."""
 
 import re
+from functools import lru_cache
 
 from fpdf import FPDF
 
 from config import SECTIONS
 
+# Section headings only depend on config, so build them once at import
+_MD_SECTION_HEADINGS = {
+    section["id"]: f"## {section['emoji']} {section['title']}" for section in SECTIONS
+}
+
 
 def briefing_to_markdown(briefing: dict) -> str:
     """Convert a briefing dict to a clean markdown document."""
     lines = [
-        f"# Food Industry Weekly Briefing",
+        "# Food Industry Weekly Briefing",
         f"### {briefing['date_range']}",
         "",
     ]
 
+    # Content is added by reference (not copied into an f-string), so the
+    # final join is the only pass over the large section bodies
     if briefing.get("top3"):
-        lines.append("## Key Developments This Week")
-        lines.append("")
-        lines.append(briefing["top3"])
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-
-    for section in SECTIONS:
-        data = briefing["sections"].get(section["id"])
-        if not data:
+        lines += ("## Key Developments This Week", "", briefing["top3"], "", "---", "")
+
+    for section_id, content in briefing["sections"].items():
+        heading = _MD_SECTION_HEADINGS.get(section_id)
+        if not heading or not content:
             continue
-        lines.append(f"## {data['emoji']} {data['title']}")
-        lines.append("")
-        lines.append(data["content"])
-        lines.append("")
+        lines += (heading, "", content, "")
 
     lines.append("---")
     lines.append(f"*Generated: {briefing['generated_at'][:16].replace('T', ' ')}*")
@@ -60,65 +60,158 @@ class _BriefingPDF(FPDF):
         self.cell(0, 10, f"Page {self.page_no()}/{{nb}}", align="C")
 
 
+# Characters that Helvetica/latin-1 can't render, and their ASCII stand-ins
+_LATIN1_REPLACEMENTS = {
+    "\u2014": "--",   # em dash
+    "\u2013": "-",    # en dash
+    "\u2018": "'",    # left single quote
+    "\u2019": "'",    # right single quote
+    "\u201c": '"',    # left double quote
+    "\u201d": '"',    # right double quote
+    "\u2026": "...",  # ellipsis
+    "\u2022": "-",    # bullet
+    "\u00a0": " ",    # non-breaking space
+    "\u2010": "-",    # hyphen
+    "\u2011": "-",    # non-breaking hyphen
+    "\u2012": "-",    # figure dash
+    "\u2032": "'",    # prime
+    "\u2033": '"',    # double prime
+    "\u20ac": "EUR",  # euro sign (not in latin-1 core fonts)
+    "\u2122": "(TM)", # trademark
+    "\u2020": "+",    # dagger
+    "\u2021": "++",   # double dagger
+    "\u2039": "<",    # single left angle quote
+    "\u203a": ">",    # single right angle quote
+    "\u00ab": "<<",   # left double angle quote
+    "\u00bb": ">>",   # right double angle quote
+}
+
+
+def _drop_non_latin1(text: str) -> str:
+    """Drop any remaining non-latin-1 characters silently (no ? marks)."""
+    # Most text is plain ASCII by now; skip the encode/decode round trip
+    if text.isascii():
+        return text
+    return text.encode("latin-1", errors="ignore").decode("latin-1")
+
+
+# Only short strings come through here (date ranges, titles, subheadings;
+# body lines go through _to_plain_latin1), and they recur across exports
+@lru_cache(maxsize=1024)
 def _sanitize_for_latin1(text: str) -> str:
     """Replace characters that Helvetica/latin-1 can't render."""
-    replacements = {
-        "\u2014": "--",   # em dash
-        "\u2013": "-",    # en dash
-        "\u2018": "'",    # left single quote
-        "\u2019": "'",    # right single quote
-        "\u201c": '"',    # left double quote
-        "\u201d": '"',    # right double quote
-        "\u2026": "...",  # ellipsis
-        "\u2022": "-",    # bullet
-        "\u00a0": " ",    # non-breaking space
-        "\u2010": "-",    # hyphen
-        "\u2011": "-",    # non-breaking hyphen
-        "\u2012": "-",    # figure dash
-        "\u2032": "'",    # prime
-        "\u2033": '"',    # double prime
-        "\u20ac": "EUR",  # euro sign (not in latin-1 core fonts)
-        "\u2122": "(TM)", # trademark
-        "\u2020": "+",    # dagger
-        "\u2021": "++",   # double dagger
-        "\u2039": "<",    # single left angle quote
-        "\u203a": ">",    # single right angle quote
-        "\u00ab": "<<",   # left double angle quote
-        "\u00bb": ">>",   # right double angle quote
-    }
-    for char, repl in replacements.items():
-        text = text.replace(char, repl)
-    # Drop any remaining non-latin-1 characters silently (no ? marks)
-    return text.encode("latin-1", errors="ignore").decode("latin-1")
+    # Most lines contain few of these, so only call replace for those present.
+    # (str.translate measures slower here: the multi-character replacements
+    # push it onto its per-character slow path.)
+    for char, repl in _LATIN1_REPLACEMENTS.items():
+        if char in text:
+            text = text.replace(char, repl)
+    return _drop_non_latin1(text)
+
+
+# Section titles for the PDF (emoji dropped: Helvetica can't render them)
+_PDF_SECTION_TITLES = {
+    section["id"]: _sanitize_for_latin1(section["title"]) for section in SECTIONS
+}
+
+
+_LATIN1_CHARS_RE = re.compile("[" + "".join(map(re.escape, _LATIN1_REPLACEMENTS)) + "]")
+# A markdown link [text](url), or a single character with an ASCII stand-in
+_LINK_OR_LATIN1_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)|" + _LATIN1_CHARS_RE.pattern)
+# Bold (**text**) and italic (*text*) runs, captured so split keeps them
+_EMPHASIS_RE = re.compile(r"(\*\*[^*]+\*\*|\*[^*]+\*)")
+
 
+def _plain_replacement(match: re.Match) -> str:
+    if match.lastindex is None:
+        return _LATIN1_REPLACEMENTS[match.group()]
+    plain = f"{match.group(1)} ({match.group(2)})"
+    if plain.isascii():
+        return plain
+    # The link match consumed its text, so substitute inside it here
+    return _LATIN1_CHARS_RE.sub(_plain_replacement, plain)
 
-def _strip_markdown_links(text: str) -> str:
-    """Convert [text](url) to 'text (url)' for plain-text rendering."""
-    return re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r"\1 (\2)", text)
+
+def _to_plain_latin1(text: str) -> str:
+    """Convert [text](url) to 'text (url)' and sanitize for latin-1 in one pass."""
+    text = _LINK_OR_LATIN1_RE.sub(_plain_replacement, text)
+    return _drop_non_latin1(text)
 
 
 def _render_markdown_line(pdf: FPDF, line: str):
     """Render a single line of markdown-ish text into the PDF, handling bold and italic."""
-    line = _strip_markdown_links(line)
-    line = _sanitize_for_latin1(line)
-    # Split on bold (**text**) and italic (*text*) markers
-    parts = re.split(r"(\*\*[^*]+\*\*|\*[^*]+\*)", line)
-    for part in parts:
-        if part.startswith("**") and part.endswith("**"):
-            pdf.set_font("Helvetica", "B", 10)
-            pdf.write(5, part[2:-2])
-        elif part.startswith("*") and part.endswith("*"):
-            pdf.set_font("Helvetica", "I", 10)
-            pdf.write(5, part[1:-1])
+    # Plain ASCII with no links needs neither link stripping nor sanitizing
+    if "[" in line or not line.isascii():
+        line = _to_plain_latin1(line)
+    # No emphasis markers: the whole line is one regular run
+    if "*" not in line:
+        pdf.set_font("Helvetica", "", 10)
+        pdf.write(5, line)
+        pdf.ln(6)
+        return
+    # Split on bold (**text**) and italic (*text*) markers. With a capturing
+    # pattern, split puts the matched runs at odd indices and plain text at
+    # even ones, so the position alone says which is which.
+    parts = _EMPHASIS_RE.split(line)
+    current_style = None
+    for i, part in enumerate(parts):
+        # split leaves empty strings around matches at the ends or back to back
+        if not part:
+            continue
+        if not i % 2:
+            style, text = "", part
+        elif part[1] == "*":
+            style, text = "B", part[2:-2]
         else:
-            pdf.set_font("Helvetica", "", 10)
-            pdf.write(5, part)
+            style, text = "I", part[1:-1]
+        # Only switch fonts when the style actually changes within the line
+        if style != current_style:
+            pdf.set_font("Helvetica", style, 10)
+            current_style = style
+        pdf.write(5, text)
     pdf.ln(6)
 
 
+_BLANK, _HEADING, _BULLET, _TEXT = range(4)
+
+
+def _classify_lines(text: str):
+    """Yield (kind, text) for each line of markdown content, minus its marker."""
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            yield _BLANK, ""
+        elif line[0] == "#":
+            yield _HEADING, line.lstrip("#").strip()
+        elif line[:2] in ("- ", "* "):
+            yield _BULLET, line[2:]
+        else:
+            yield _TEXT, line
+
+
+def _render_content(pdf: FPDF, text: str):
+    """Render markdown content (subheadings, bullets, and text lines) into the PDF."""
+    for kind, line in _classify_lines(text):
+        if kind == _TEXT:
+            _render_markdown_line(pdf, line)
+        elif kind == _BULLET:
+            pdf.set_font("Helvetica", "", 10)
+            pdf.write(5, "  -  ")
+            _render_markdown_line(pdf, line)
+        elif kind == _BLANK:
+            pdf.ln(2)
+        else:
+            # Markdown subheadings (###, ##, #)
+            pdf.ln(3)
+            pdf.set_font("Helvetica", "B", 11)
+            pdf.cell(0, 7, _sanitize_for_latin1(line), new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(1)
+
+
 def briefing_to_pdf(briefing: dict) -> bytes:
     """Convert a briefing dict to PDF bytes."""
-    pdf = _BriefingPDF(_sanitize_for_latin1(briefing["date_range"]))
+    date_range = _sanitize_for_latin1(briefing["date_range"])
+    pdf = _BriefingPDF(date_range)
     pdf.alias_nb_pages()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=20)
@@ -129,7 +222,7 @@ def briefing_to_pdf(briefing: dict) -> bytes:
     pdf.cell(0, 12, "Food Industry Weekly Briefing", new_x="LMARGIN", new_y="NEXT")
     pdf.set_font("Helvetica", "", 12)
     pdf.set_text_color(100, 100, 100)
-    pdf.cell(0, 8, _sanitize_for_latin1(briefing["date_range"]), new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 8, date_range, new_x="LMARGIN", new_y="NEXT")
     pdf.ln(6)
 
     # Top 3 highlights
@@ -141,63 +234,28 @@ def briefing_to_pdf(briefing: dict) -> bytes:
         pdf.line(10, pdf.get_y(), 80, pdf.get_y())
         pdf.ln(3)
         pdf.set_text_color(30, 30, 30)
-        for line in briefing["top3"].split("\n"):
-            line = line.strip()
-            if not line:
-                pdf.ln(2)
-                continue
-            if line.startswith("- ") or line.startswith("* "):
-                pdf.set_font("Helvetica", "", 10)
-                pdf.write(5, "  -  ")
-                _render_markdown_line(pdf, line[2:])
-            else:
-                _render_markdown_line(pdf, line)
+        _render_content(pdf, briefing["top3"])
         pdf.ln(6)
         pdf.set_draw_color(200, 200, 200)
         pdf.line(10, pdf.get_y(), 200, pdf.get_y())
         pdf.ln(6)
 
-    for section in SECTIONS:
-        data = briefing["sections"].get(section["id"])
-        if not data:
+    for section_id, content in briefing["sections"].items():
+        title = _PDF_SECTION_TITLES.get(section_id)
+        if not title or not content:
             continue
 
         # Section heading
         pdf.set_font("Helvetica", "B", 13)
         pdf.set_text_color(37, 99, 235)
-        # Use ASCII fallback for emoji in PDF (fpdf2 Helvetica doesn't support emoji)
-        pdf.cell(
-            0, 10, f"{data['title']}", new_x="LMARGIN", new_y="NEXT"
-        )
+        pdf.cell(0, 10, title, new_x="LMARGIN", new_y="NEXT")
         pdf.set_draw_color(37, 99, 235)
         pdf.line(10, pdf.get_y(), 80, pdf.get_y())
         pdf.ln(3)
 
         # Section content
         pdf.set_text_color(30, 30, 30)
-        content = data["content"]
-        for line in content.split("\n"):
-            line = line.strip()
-            if not line:
-                pdf.ln(2)
-                continue
-            # Handle markdown subheadings (###, ##, #)
-            if line.startswith("#"):
-                heading_text = line.lstrip("#").strip()
-                heading_text = _sanitize_for_latin1(heading_text)
-                pdf.ln(3)
-                pdf.set_font("Helvetica", "B", 11)
-                pdf.set_text_color(30, 30, 30)
-                pdf.cell(0, 7, heading_text, new_x="LMARGIN", new_y="NEXT")
-                pdf.ln(1)
-                pdf.set_text_color(30, 30, 30)
-            # Handle bullet points
-            elif line.startswith("- ") or line.startswith("* "):
-                pdf.set_font("Helvetica", "", 10)
-                pdf.write(5, "  -  ")
-                _render_markdown_line(pdf, line[2:])
-            else:
-                _render_markdown_line(pdf, line)
+        _render_content(pdf, content)
 
         pdf.ln(4)
 